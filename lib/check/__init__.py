@@ -23,12 +23,16 @@ checks
 '''
 
 import abc
+import bisect
 import collections
 import difflib
 import email.utils
+import functools
 import heapq
+import itertools
 import os
 import re
+import string
 import types
 import urllib.parse
 
@@ -55,7 +59,7 @@ class EnvironmentNotPatched(RuntimeError):
 class EnvironmentAlreadyPatched(RuntimeError):
     pass
 
-find_unusual_characters = re.compile(
+_find_unusual_characters = re.compile(
     r'[\x00-\x08\x0B-\x1A\x1C-\x1F]'  # C0 except TAB, LF, ESC
     r'|\x1B(?!\[)'  # ESC, except when followed by [
     r'|\x7F'  # DEL
@@ -66,6 +70,162 @@ find_unusual_characters = re.compile(
     r'|(?<=\w)\xBF'  # INVERTED QUESTION MARK but only directly after a letter
 ).findall
 
+# superset of characters that _find_unusual_characters() can ever find:
+_unusual_character_candidates = frozenset(map(chr, itertools.chain(
+    range(0x00, 0x09),
+    range(0x0B, 0x20),
+    [0x7F],
+    range(0x80, 0xA0),
+    [0xBF],
+    [0xFEFF],
+    [0xFFFD],
+    [0xFFFE, 0xFFFF],
+)))
+
+def find_unusual_characters(s):
+    # Most strings don't contain any unusual characters,
+    # and these checks are much cheaper than running the regexp.
+    if s.isprintable():
+        # U+00BF and U+FFFD are the only printable candidates.
+        if '\xBF' not in s and '\uFFFD' not in s:
+            return []
+    elif _unusual_character_candidates.isdisjoint(s):
+        return []
+    return _find_unusual_characters(s)
+
+_boilerplate_regexs = [
+    r'\bPACKAGE package\b',
+    r'\bCopyright \S+ YEAR\b',
+    r"\bTHE PACKAGE'S COPYRIGHT HOLDER\b",
+]
+_template_boilerplate_re = re.compile(
+    '|'.join(_boilerplate_regexs)
+)
+_boilerplate_regexs += [
+    r'\bFIRST AUTHOR\b',
+    r'<EMAIL@ADDRESS>',
+    r'(?<=>), YEAR\b',
+]
+_boilerplate_re = re.compile(
+    '|'.join(_boilerplate_regexs)
+)
+del _boilerplate_regexs
+
+# Each of the above regexps matches only strings
+# that contain one of these literals:
+_template_boilerplate_literals = (
+    'PACKAGE package',
+    'YEAR',
+    "THE PACKAGE'S COPYRIGHT HOLDER",
+)
+_boilerplate_literals = _template_boilerplate_literals + (
+    'FIRST AUTHOR',
+    '<EMAIL@ADDRESS>',
+)
+
+_search_for_letter = re.compile(r'[^_\d\W]').search
+
+_ascii_digits = frozenset('0123456789')
+
+_boilerplate_project_id_versions = frozenset({'PACKAGE VERSION', 'PROJECT VERSION'})
+
+_boilerplate_team_emails = frozenset({'LL@li.org', 'EMAIL@ADDRESS'})
+
+_search_for_charset = re.compile(r'(\Atext/plain; )?\bcharset=([^\s;]+)\Z').search
+
+_simple_email_address = r'[A-Za-z0-9_+-]+(?:[.][A-Za-z0-9_+-]+)*@[A-Za-z0-9-]+(?:[.][A-Za-z0-9-]+)*'
+_match_simple_email_address = re.compile(r'''
+    \A
+    (?:
+      [A-Za-z0-9_-]+ (?: [ ] [A-Za-z0-9_-]+ )* [ ] < ({addr}) >
+    | ({addr})
+    )
+    \Z
+'''.format(addr=_simple_email_address), re.VERBOSE).match
+del _simple_email_address
+
+def _get_email_address(s):
+    '''
+    return e-mail address part of s,
+    the same as email.utils.parseaddr(s)[1]
+    '''
+    match = _match_simple_email_address(s)
+    if match is not None:
+        # fast path for the common “Name <user@example.org>” syntax
+        return match.group(match.lastindex)
+    (name, email_address) = email.utils.parseaddr(s)
+    del name
+    return email_address
+
+_match_uri_with_scheme = re.compile(r'[A-Za-z][A-Za-z0-9+.-]*://').match
+
+_match_syntax_error_lineno = re.compile(r'^\(line ([0-9]+)\)(?:: (.+))?$').match
+def _is_lowercase_phrase(s):
+    '''
+    is s a sequence of lowercase ASCII words separated by single spaces?
+    '''
+    return all(
+        word and not word.strip(string.ascii_lowercase)
+        for word in s.split(' ')
+    )
+
+_match_range_flag_value = re.compile(r'\A([0-9]+)[.][.]([0-9]+)\Z').match
+
+_match_xml_comment = re.compile(
+    r'\Atype: Content of: (<{xmlname}>)+\Z'.format(xmlname=xml.name_re)
+).match
+
+def _count_flags(flags):
+    '''
+    return sorted list of (flag, number of its occurrences) pairs
+    '''
+    # Flag lists are tiny, so this is cheaper than collections.Counter.
+    counts = {}
+    for flag in flags:
+        counts[flag] = counts.get(flag, 0) + 1
+    if len(counts) > 1:
+        return sorted(counts.items())
+    # nothing to sort:
+    return list(counts.items())
+
+_wrap_flags = frozenset({'wrap', 'no-wrap'})
+
+_format_flag_prefixes = frozenset({'no', 'possible', 'impossible'})
+
+_header_fields = frozenset(gettext.header_fields)
+_header_fields_lc = {str.lower(s): s for s in _header_fields}
+
+@functools.lru_cache(maxsize=256)
+def _get_close_match(word, possibilities):
+    '''
+    return the best close match for word among possibilities, or None;
+    the same as difflib.get_close_matches(word, possibilities, n=1, cutoff=0.8)
+    '''
+    # difflib is slow, but the same misspellings tend to be repeated
+    # across many files, so the results are cached.
+    matches = difflib.get_close_matches(word, possibilities, n=1, cutoff=0.8)
+    if matches:
+        [match] = matches
+        return match
+
+# constant tag arguments:
+_cannot_be_decoded_as = tags.safestr('cannot be decoded as')
+_from_language_header_field = tags.safestr('(Language header field)')
+_from_x_poedit_language_header_field = tags.safestr('(X-Poedit-Language header field)')
+_language_header_field_hint = tags.safestr('Language:')
+_from_plural_forms_header_field = tags.safestr('(Plural-Forms header field)')
+_from_number_of_msgstr_items = tags.safestr('(number of msgstr items)')
+_mime_version_hint = tags.safestr('MIME-Version: 1.0')
+_content_transfer_encoding_hint = tags.safestr('Content-Transfer-Encoding: 8bit')
+
+# extension => (constructor, is_template, is_binary)
+_file_types = {
+    '.po': (polib.pofile, False, False),
+    '.pot': (polib.pofile, True, False),
+    '.mo': (polib.mofile, False, True),
+    '.gmo': (polib.mofile, False, True),
+}
+
 header_fields_with_dedicated_checks = set()
 
 def checks_header_fields(*fields):
@@ -74,6 +234,28 @@ def checks_header_fields(*fields):
     header_fields_with_dedicated_checks.update(fields)
     return identity
 
+_message_format_checker_classes = {
+    'c': msgformat_c.Checker,
+    'perl-brace': msgformat_perlbrace.Checker,
+    'python': msgformat_python.Checker,
+    'python-brace': msgformat_pybrace.Checker,
+}
+
+class _MessageFormatCheckers(dict):
+
+    '''
+    message format checkers, created on first use
+    '''
+
+    def __init__(self, parent):
+        super().__init__()
+        self._parent = parent
+
+    def __missing__(self, fmt):
+        cls = _message_format_checker_classes[fmt]
+        checker = self[fmt] = cls(self._parent)
+        return checker
+
 class Checker(metaclass=abc.ABCMeta):
 
     _patched_environment = None
@@ -100,12 +282,7 @@ class Checker(metaclass=abc.ABCMeta):
             if path.startswith(real_root):
                 self.fake_path = fake_root + path[len(real_root):]
         self.options = options
-        self._message_format_checkers = {
-            'c': msgformat_c.Checker(self),
-            'perl-brace': msgformat_perlbrace.Checker(self),
-            'python': msgformat_python.Checker(self),
-            'python-brace': msgformat_pybrace.Checker(self),
-        }
+        self._message_format_checkers = _MessageFormatCheckers(self)
 
     @abc.abstractmethod
     def tag(self, tagname, *extra):
@@ -124,26 +301,28 @@ class Checker(metaclass=abc.ABCMeta):
             extension = os.path.splitext(self.path)[-1]
         else:
             extension = '.' + self.options.file_type
-        is_template = False
-        is_binary = False
-        if extension == '.po':
-            constructor = polib.pofile
-        elif extension == '.pot':
-            constructor = polib.pofile
-            is_template = True
-        elif extension in {'.mo', '.gmo'}:
-            constructor = polib.mofile
-            is_binary = True
-        else:
+        try:
+            (constructor, is_template, is_binary) = _file_types[extension]
+        except KeyError:
             self.tag('unknown-file-type')
             return
+        # Read the file only once,
+        # so that the parsers don't have to open it again.
+        try:
+            with open(self.path, 'rb') as file:
+                contents = file.read()
+        except OSError as exc:
+            self.tag('os-error', tags.safestr(exc.strerror))
+            return
         broken_encoding = False
         try:
             try:
-                file = constructor(self.path)
+                with misc.preloaded_file(self.path, contents):
+                    file = constructor(self.path)
             except UnicodeDecodeError as exc:
                 broken_encoding = exc
-                file = constructor(self.path, encoding='ISO-8859-1')
+                with misc.preloaded_file(self.path, contents):
+                    file = constructor(self.path, encoding='ISO-8859-1')
         except polib4us.moparser.SyntaxError as exc:
             self.tag('invalid-mo-file', tags.safestr(exc))
             return
@@ -157,13 +336,13 @@ class Checker(metaclass=abc.ABCMeta):
                 message_parts = []
                 if message.startswith(self.path + ' '):
                     message = message[len(self.path)+1:]
-                match = re.match(r'^\(line ([0-9]+)\)(?:: (.+))?$', message)
+                match = _match_syntax_error_lineno(message)
                 if match is not None:
                     lineno_part = 'line {}'.format(match.group(1))
                     message = match.group(2)
                     if message is not None:
                         lineno_part += ':'
-                        if re.match(r'^[a-z]+( [a-z]+)*$', message):
+                        if _is_lowercase_phrase(message):
                             message = tags.safestr(message)
                     message_parts += [tags.safestr(lineno_part)]
                 if message is not None:
@@ -181,13 +360,19 @@ class Checker(metaclass=abc.ABCMeta):
                 s = s[begin:end]
                 self.tag('broken-encoding',
                     s,
-                    tags.safestr('cannot be decoded as'),
+                    _cannot_be_decoded_as,
                     broken_encoding.encoding.upper(),
                 )
                 # pylint: enable=no-member
                 broken_encoding = True
         ctx = types.SimpleNamespace()
         ctx.file = file
+        # non-obsolete messages, and the subset of them with plural forms:
+        ctx.messages = [message for message in file if not message.obsolete]
+        ctx.plural_messages = [
+            message for message in ctx.messages
+            if message.msgid_plural is not None
+        ]
         ctx.is_template = is_template
         ctx.is_binary = is_binary
         self.check_comments(ctx)
@@ -203,32 +388,42 @@ class Checker(metaclass=abc.ABCMeta):
         self.check_messages(ctx)
 
     def check_comments(self, ctx):
-        regexs = {
-            r'\bPACKAGE package\b',
-            r'\bCopyright \S+ YEAR\b',
-            r"\bTHE PACKAGE'S COPYRIGHT HOLDER\b",
+        header = ctx.file.header
+        if not header:
+            return
+        if ctx.is_template:
+            regex = _template_boilerplate_re
+            literals = _template_boilerplate_literals
+        else:
+            regex = _boilerplate_re
+            literals = _boilerplate_literals
+        if not any(s in header for s in literals):
+            return
+        positions = [match.start() for match in regex.finditer(header)]
+        if not positions:
+            return
+        # None of the regexps can match across line boundaries,
+        # so it's enough to map match positions back to lines:
+        lines = header.splitlines()
+        line_starts = [0]
+        line_starts += itertools.accumulate(
+            map(len, header.splitlines(keepends=True))
+        )
+        linenos = {
+            bisect.bisect_right(line_starts, pos) - 1
+            for pos in positions
         }
-        if not ctx.is_template:
-            regexs |= {
-                r'\bFIRST AUTHOR\b',
-                r'<EMAIL@ADDRESS>',
-                r'(?<=>), YEAR\b',
-            }
-        regex = re.compile('|'.join(regexs))
-        for line in ctx.file.header.splitlines():
-            match = regex.search(line)
-            if match is None:
-                continue
-            self.tag('boilerplate-in-initial-comments', line)
+        for i in sorted(linenos):
+            self.tag('boilerplate-in-initial-comments', lines[i])
 
     @checks_header_fields('Language', 'X-Poedit-Language', 'X-Poedit-Country')
     def check_language(self, ctx):
         ctx.language = None
         duplicate_meta_language = False
-        meta_languages = ctx.metadata['Language']
+        meta_languages = ctx.header_fields.language
         if len(meta_languages) > 1:
             self.tag('duplicate-header-field-language')
-            meta_languages = sorted(set(meta_languages))
+            meta_languages = misc.unique(meta_languages)
             if len(meta_languages) > 1:
                 duplicate_meta_language = True
         if len(meta_languages) == 1:
@@ -244,13 +439,10 @@ class Checker(metaclass=abc.ABCMeta):
         language_source = 'command-line'
         language_source_quality = 1
         if language is None:
-            path_components = os.path.normpath(self.path).split('/')
-            try:
-                i = path_components.index('LC_MESSAGES')
-            except ValueError:
-                i = 0
-            if i > 0:
-                language = path_components[i - 1]
+            path = os.path.normpath(self.path) + '/'
+            i = path.find('/LC_MESSAGES/')
+            if i >= 0:
+                language = path[path.rfind('/', 0, i) + 1:i]
                 try:
                     language = ling.parse_language(language)
                     language.fix_codes()
@@ -261,7 +453,7 @@ class Checker(metaclass=abc.ABCMeta):
                     language = None
                 else:
                     language_source = 'pathname'
-            del path_components, i
+            del path, i
         if language is None and self.path.endswith('.po'):
             language, ext = os.path.splitext(os.path.basename(self.path))
             assert ext == '.po'
@@ -321,16 +513,16 @@ class Checker(metaclass=abc.ABCMeta):
                 self.tag('language-disparity',
                     language, tags.safestr('({})'.format(language_source)),
                     '!=',
-                    meta_language, tags.safestr('(Language header field)')
+                    meta_language, _from_language_header_field
                 )
-        poedit_languages = ctx.metadata['X-Poedit-Language']
+        poedit_languages = ctx.header_fields.x_poedit_language
         if len(poedit_languages) > 1:
             self.tag('duplicate-header-field-x-poedit', 'X-Poedit-Language')
-            poedit_languages = sorted(set(poedit_languages))
-        poedit_countries = ctx.metadata['X-Poedit-Country']
+            poedit_languages = misc.unique(poedit_languages)
+        poedit_countries = ctx.header_fields.x_poedit_country
         if len(poedit_countries) > 1:
             self.tag('duplicate-header-field-x-poedit', 'X-Poedit-Country')
-            poedit_countries = sorted(set(poedit_countries))
+            poedit_countries = misc.unique(poedit_countries)
         if len(poedit_languages) == 1 and len(poedit_countries) <= 1:
             [poedit_language] = poedit_languages
             # FIXME: This should take also X-Poedit-Country into account.
@@ -346,7 +538,7 @@ class Checker(metaclass=abc.ABCMeta):
                     self.tag('language-disparity',
                         language, tags.safestr('({})'.format(language_source)),
                         '!=',
-                        poedit_language, tags.safestr('(X-Poedit-Language header field)')
+                        poedit_language, _from_x_poedit_language_header_field
                     )
         if language is None:
             if not orig_meta_language and not duplicate_meta_language:
@@ -354,16 +546,16 @@ class Checker(metaclass=abc.ABCMeta):
             self.tag('unable-to-determine-language')
             return
         if not orig_meta_language and not duplicate_meta_language:
-            self.tag('no-language-header-field', tags.safestr('Language:'), language)
+            self.tag('no-language-header-field', _language_header_field_hint, language)
         ctx.language = language
 
     @checks_header_fields('Plural-Forms')
     def check_plurals(self, ctx):
         ctx.plural_preimage = None
-        plural_forms = ctx.metadata['Plural-Forms']
+        plural_forms = ctx.header_fields.plural_forms
         if len(plural_forms) > 1:
             self.tag('duplicate-header-field-plural-forms')
-            plural_forms = sorted(set(plural_forms))
+            plural_forms = misc.unique(plural_forms)
             if len(plural_forms) > 1:
                 return
         if len(plural_forms) == 1:
@@ -374,18 +566,25 @@ class Checker(metaclass=abc.ABCMeta):
         correct_plural_forms = None
         if ctx.language is not None:
             correct_plural_forms = ctx.language.get_plural_forms()
-        has_plurals = False  # messages with plural forms (translated or not)?
+        has_plurals = bool(ctx.plural_messages)  # messages with plural forms (translated or not)?
         expected_nplurals = {}  # number of plurals in _translated_ messages
-        for message in ctx.file:
-            if message.obsolete:
+        seen_nplurals = seen_message = None
+        for message in ctx.plural_messages:
+            if not message.translated():
                 continue
-            if message.msgid_plural is not None:
-                has_plurals = True
-                if not message.translated():
-                    continue
-                expected_nplurals[len(message.msgstr_plural)] = message
-                if len(expected_nplurals) > 1:
-                    break
+            nplurals = len(message.msgstr_plural)
+            if seen_nplurals is None or nplurals == seen_nplurals:
+                seen_nplurals = nplurals
+                seen_message = message
+            else:
+                expected_nplurals = {
+                    seen_nplurals: seen_message,
+                    nplurals: message,
+                }
+                break
+        else:
+            if seen_nplurals is not None:
+                expected_nplurals = {seen_nplurals: seen_message}
         if len(expected_nplurals) > 1:
             args = []
             for n, message in sorted(expected_nplurals.items()):
@@ -425,8 +624,8 @@ class Checker(metaclass=abc.ABCMeta):
             [expected_nplurals] = expected_nplurals.keys()
             if n != expected_nplurals:
                 self.tag('incorrect-number-of-plural-forms',
-                    n, tags.safestr('(Plural-Forms header field)'), '!=',
-                    expected_nplurals, tags.safestr('(number of msgstr items)')
+                    n, _from_plural_forms_header_field, '!=',
+                    expected_nplurals, _from_number_of_msgstr_items
                 )
         locally_correct_n = locally_correct_expr = None
         if correct_plural_forms is not None:
@@ -445,9 +644,13 @@ class Checker(metaclass=abc.ABCMeta):
         plural_preimage = collections.defaultdict(list)
         unusual_plural_forms = False
         codomain_limit = 200
+        f = expr.evaluator()
+        locally_correct_f = None
+        if locally_correct_expr is not None:
+            locally_correct_f = locally_correct_expr.evaluator()
         try:
             for i in range(codomain_limit):
-                fi = expr(i)
+                fi = f(i)
                 if fi >= n:
                     message = tags.safe_format('f({}) = {} >= {}'.format(i, fi, n))
                     if has_plurals:
@@ -456,7 +659,7 @@ class Checker(metaclass=abc.ABCMeta):
                         self.tag('codomain-error-in-unused-plural-forms', message)
                     break
                 plural_preimage[fi] += [i]
-                if (n == locally_correct_n) and (fi != locally_correct_expr(i)) and (not unusual_plural_forms):
+                if (n == locally_correct_n) and (fi != locally_correct_f(i)) and (not unusual_plural_forms):
                     if has_plurals:
                         self.tag('unusual-plural-forms', plural_forms, '=>', plural_forms_hint)
                     else:
@@ -509,30 +712,30 @@ class Checker(metaclass=abc.ABCMeta):
     def check_mime(self, ctx):
         ctx.encoding = None
         # MIME-Version:
-        mime_versions = ctx.metadata['MIME-Version']
+        mime_versions = ctx.header_fields.mime_version
         if len(mime_versions) > 1:
             self.tag('duplicate-header-field-mime-version')
-            mime_versions = sorted(set(mime_versions))
+            mime_versions = misc.unique(mime_versions)
         for mime_version in mime_versions:
             if mime_version != '1.0':
                 self.tag('invalid-mime-version', mime_version, '=>', '1.0')
         if len(mime_versions) == 0:
-            self.tag('no-mime-version-header-field', tags.safestr('MIME-Version: 1.0'))
+            self.tag('no-mime-version-header-field', _mime_version_hint)
         # Content-Transfer-Encoding:
-        ctes = ctx.metadata['Content-Transfer-Encoding']
+        ctes = ctx.header_fields.content_transfer_encoding
         if len(ctes) > 1:
             self.tag('duplicate-header-field-content-transfer-encoding')
-            ctes = sorted(set(ctes))
+            ctes = misc.unique(ctes)
         for cte in ctes:
             if cte != '8bit':
                 self.tag('invalid-content-transfer-encoding', cte, '=>', '8bit')
         if len(ctes) == 0:
-            self.tag('no-content-transfer-encoding-header-field', tags.safestr('Content-Transfer-Encoding: 8bit'))
+            self.tag('no-content-transfer-encoding-header-field', _content_transfer_encoding_hint)
         # Content-Type:
-        cts = ctx.metadata['Content-Type']
+        cts = ctx.header_fields.content_type
         if len(cts) > 1:
             self.tag('duplicate-header-field-content-type')
-            cts = sorted(set(cts))
+            cts = misc.unique(cts)
         elif len(cts) == 0:
             content_type_hint = 'text/plain; charset=<encoding>'
             self.tag('no-content-type-header-field', tags.safestr('Content-Type: ' + content_type_hint))
@@ -540,7 +743,7 @@ class Checker(metaclass=abc.ABCMeta):
         encodings = set()
         for ct in cts:
             content_type_hint = 'text/plain; charset=<encoding>'
-            match = re.search(r'(\Atext/plain; )?\bcharset=([^\s;]+)\Z', ct)
+            match = _search_for_charset(ct)
             if match:
                 encoding = match.group(2)
                 try:
@@ -584,15 +787,17 @@ class Checker(metaclass=abc.ABCMeta):
     @checks_header_fields('POT-Creation-Date', 'PO-Revision-Date')
     def check_dates(self, ctx):
         try:
-            content_type = ctx.metadata['Content-Type'][0]
+            content_type = ctx.header_fields.content_type[0]
         except IndexError:
             content_type = ''
         is_publican = content_type.startswith('application/x-publican;')
-        for field in 'POT-Creation-Date', 'PO-Revision-Date':
-            dates = ctx.metadata[field]
+        for field, dates in [
+            ('POT-Creation-Date', ctx.header_fields.pot_creation_date),
+            ('PO-Revision-Date', ctx.header_fields.po_revision_date),
+        ]:
             if len(dates) > 1:
                 self.tag('duplicate-header-field-date', field)
-                dates = sorted(set(dates))
+                dates = misc.unique(dates)
             elif len(dates) == 0:
                 if field.startswith('POT-') and ctx.is_binary:
                     # In gettext >> 0.19.8.1, msgfmt will be removing
@@ -631,33 +836,37 @@ class Checker(metaclass=abc.ABCMeta):
     @checks_header_fields('Project-Id-Version', 'Report-Msgid-Bugs-To')
     def check_project(self, ctx):
         # Project-Id-Version:
-        project_id_versions = ctx.metadata['Project-Id-Version']
+        project_id_versions = ctx.header_fields.project_id_version
         if len(project_id_versions) > 1:
             self.tag('duplicate-header-field-project-id-version')
-            project_id_versions = sorted(set(project_id_versions))
+            project_id_versions = misc.unique(project_id_versions)
         elif len(project_id_versions) == 0:
             self.tag('no-project-id-version-header-field')
         for project_id_version in project_id_versions:
-            if project_id_version in {'PACKAGE VERSION', 'PROJECT VERSION'}:
+            if project_id_version in _boilerplate_project_id_versions:
                 self.tag('boilerplate-in-project-id-version', project_id_version)
             else:
-                if not re.search(r'[^_\d\W]', project_id_version):
+                if not _search_for_letter(project_id_version):
                     self.tag('no-package-name-in-project-id-version', project_id_version)
-                if not re.search(r'[0-9]', project_id_version):
+                if _ascii_digits.isdisjoint(project_id_version):
                     self.tag('no-version-in-project-id-version', project_id_version)
         # Report-Msgid-Bugs-To:
-        report_msgid_bugs_tos = ctx.metadata['Report-Msgid-Bugs-To']
+        report_msgid_bugs_tos = ctx.header_fields.report_msgid_bugs_to
         if len(report_msgid_bugs_tos) > 1:
             self.tag('duplicate-header-field-report-msgid-bugs-to')
-            report_msgid_bugs_tos = sorted(set(report_msgid_bugs_tos))
+            report_msgid_bugs_tos = misc.unique(report_msgid_bugs_tos)
         if report_msgid_bugs_tos == ['']:
             report_msgid_bugs_tos = []
         if len(report_msgid_bugs_tos) == 0:
             self.tag('no-report-msgid-bugs-to-header-field')
         for report_msgid_bugs_to in report_msgid_bugs_tos:
-            real_name, email_address = email.utils.parseaddr(report_msgid_bugs_to)
-            del real_name
+            if '@' in report_msgid_bugs_to:
+                email_address = _get_email_address(report_msgid_bugs_to)
+            else:
+                email_address = ''
             if '@' not in email_address:
+                if _match_uri_with_scheme(report_msgid_bugs_to):
+                    continue
                 uri = urllib.parse.urlparse(report_msgid_bugs_to)
                 if uri.scheme == '':
                     self.tag('invalid-report-msgid-bugs-to', report_msgid_bugs_to)
@@ -671,16 +880,15 @@ class Checker(metaclass=abc.ABCMeta):
     @checks_header_fields('Last-Translator', 'Language-Team')
     def check_translator(self, ctx):
         # Last-Translator:
-        translators = ctx.metadata['Last-Translator']
+        translators = ctx.header_fields.last_translator
         if len(translators) > 1:
             self.tag('duplicate-header-field-last-translator')
-            translators = sorted(set(translators))
+            translators = misc.unique(translators)
         elif len(translators) == 0:
             self.tag('no-last-translator-header-field')
         translator_emails = {}
         for translator in translators:
-            translator_name, translator_email = email.utils.parseaddr(translator)
-            del translator_name
+            translator_email = _get_email_address(translator)
             translator_emails[translator_email] = translator
             if '@' not in translator_email:
                 self.tag('invalid-last-translator', translator)
@@ -692,22 +900,21 @@ class Checker(metaclass=abc.ABCMeta):
             elif domains.is_email_in_dotless_domain(translator_email):
                 self.tag('invalid-last-translator', translator)
         # Language-Team:
-        teams = ctx.metadata['Language-Team']
+        teams = ctx.header_fields.language_team
         if len(teams) > 1:
             self.tag('duplicate-header-field-language-team')
-            teams = sorted(set(teams))
+            teams = misc.unique(teams)
         elif len(teams) == 0:
             self.tag('no-language-team-header-field')
         for team in teams:
-            team_name, team_email = email.utils.parseaddr(team)
-            del team_name
+            team_email = _get_email_address(team)
             if '@' not in team_email:
                 # TODO: A URL is also allowed here.
                 # self.tag('invalid-language-team', translator)
                 pass
             elif domains.is_email_in_special_domain(team_email):
                 self.tag('invalid-language-team', team)
-            elif team_email in {'LL@li.org', 'EMAIL@ADDRESS'}:
+            elif team_email in _boilerplate_team_emails:
                 if not ctx.is_template:
                     self.tag('boilerplate-in-language-team', team)
             elif domains.is_email_in_dotless_domain(team_email):
@@ -722,8 +929,8 @@ class Checker(metaclass=abc.ABCMeta):
         strays = []
         ctx.file.header_entry = None
         seen_header_entry = False
-        for entry in ctx.file:
-            if not is_header_entry(entry) or entry.obsolete:
+        for entry in ctx.messages:
+            if entry.msgid != '' or entry.msgctxt is not None:
                 continue
             if seen_header_entry:
                 self.tag('duplicate-header-entry')
@@ -741,15 +948,15 @@ class Checker(metaclass=abc.ABCMeta):
             for line in gettext.parse_header(msgstr):
                 if isinstance(line, dict):
                     [(key, value)] = line.items()
-                    metadata[key] += [value]
+                    metadata[key].append(value)
                 else:
-                    strays += [line]
-            flags = collections.Counter(entry.flags)
-            for flag, n in sorted(flags.items()):
+                    strays.append(line)
+            flags = _count_flags(entry.flags)
+            for flag, n in flags:
                 if flag == 'fuzzy':
                     if not ctx.is_template:
                         self.tag('fuzzy-header-entry')
-                elif difflib.get_close_matches(flag.lower(), ['fuzzy'], cutoff=0.8):
+                elif _get_close_match(flag.lower(), ('fuzzy',)) is not None:
                     self.tag('unexpected-flag-for-header-entry', flag, '=>', 'fuzzy')
                 else:
                     self.tag('unexpected-flag-for-header-entry', flag)
@@ -773,19 +980,15 @@ class Checker(metaclass=abc.ABCMeta):
                     seen_conflict_marker = True
             else:
                 self.tag('stray-header-line', stray)
-        header_fields = frozenset(gettext.header_fields)
-        header_fields_lc = {str.lower(s): s for s in header_fields}
         for key, values in sorted(metadata.items()):
             if key.startswith(('X-', 'x-')):
                 pass  # ok
-            elif key in header_fields:
+            elif key in _header_fields:
                 pass  # ok
             else:
-                hint = header_fields_lc.get(key.lower())
+                hint = _header_fields_lc.get(key.lower())
                 if hint is None:
-                    hints = difflib.get_close_matches(key, header_fields, n=1, cutoff=0.8)
-                    if hints:
-                        [hint] = hints
+                    hint = _get_close_match(key, _header_fields)
                 if hint in metadata:
                     hint = None
                 if hint is None:
@@ -794,22 +997,27 @@ class Checker(metaclass=abc.ABCMeta):
                     self.tag('unknown-header-field', key, '=>', hint)
             if len(values) > 1 and key not in header_fields_with_dedicated_checks:
                 self.tag('duplicate-header-field', key)
-        ctx.metadata = metadata
+        ctx.header_fields = _HeaderFields._make(
+            metadata.get(field, [])
+            for field in _HeaderFields.header_field_names
+        )
         del ctx.file.metadata
         del ctx.file.metadata_is_fuzzy
 
     def check_messages(self, ctx):
         found_unusual_characters = set()
-        msgid_counter = collections.Counter()
-        for message in ctx.file:
-            if message.obsolete:
-                continue
-            if is_header_entry(message):
+        seen_msgids = set()
+        duplicate_msgids = set()
+        for message in ctx.messages:
+            if message.msgid == '' and message.msgctxt is None:
                 continue
             flags = self._check_message_flags(message)
             self._check_message_formats(ctx, message, flags)
-            msgid_counter[message.msgid, message.msgctxt] += 1
-            if msgid_counter[message.msgid, message.msgctxt] == 2:
+            msgid_key = (message.msgid, message.msgctxt)
+            if msgid_key not in seen_msgids:
+                seen_msgids.add(msgid_key)
+            elif msgid_key not in duplicate_msgids:
+                duplicate_msgids.add(msgid_key)
                 self.tag('duplicate-message-definition', message_repr(message))
             has_msgstr = bool(message.msgstr)
             has_msgstr_plural = any(message.msgstr_plural.values())
@@ -833,26 +1041,29 @@ class Checker(metaclass=abc.ABCMeta):
                     strings += [message.msgstr]
                 if has_msgstr_plural:
                     strings += message.msgstr_plural.values()  # the order doesn't matter here
-            for s in strings:
-                if s.startswith('\n') != leading_lf:
-                    self.tag('inconsistent-leading-newlines', message_repr(message))
-                    break
-            for s in strings:
-                if s.endswith('\n') != trailing_lf:
-                    self.tag('inconsistent-trailing-newlines', message_repr(message))
-                    break
-            strings = []
-            if has_msgstr:
-                strings += [message.msgstr]
-            if has_msgstr_plural:
-                strings += misc.sorted_vk(message.msgstr_plural)
+            if any(s.startswith('\n') != leading_lf for s in strings):
+                self.tag('inconsistent-leading-newlines', message_repr(message))
+            if any(s.endswith('\n') != trailing_lf for s in strings):
+                self.tag('inconsistent-trailing-newlines', message_repr(message))
+            msgstrs = []
+            if ctx.encoding is not None or not flags.fuzzy:
+                # The translations are checked below only in these cases.
+                if has_msgstr:
+                    msgstrs += [message.msgstr]
+                if has_msgstr_plural:
+                    msgstrs += misc.sorted_vk(message.msgstr_plural)
             if ctx.encoding is not None:
-                msgid_uc = (
-                    set(find_unusual_characters(message.msgid)) |
-                    set(find_unusual_characters(message.msgid_plural or ''))
-                )
-                for msgstr in strings:
+                msgid_uc = None
+                for msgstr in msgstrs:
                     msgstr_uc = set(find_unusual_characters(msgstr))
+                    if not msgstr_uc:
+                        continue
+                    if msgid_uc is None:
+                        # Scan msgid only if there's anything to compare with:
+                        msgid_uc = (
+                            set(find_unusual_characters(message.msgid)) |
+                            set(find_unusual_characters(message.msgid_plural or ''))
+                        )
                     uc = msgstr_uc - msgid_uc - found_unusual_characters
                     if not uc:
                         continue
@@ -866,7 +1077,7 @@ class Checker(metaclass=abc.ABCMeta):
                     )
                     found_unusual_characters |= uc
             if not flags.fuzzy:
-                for msgstr in strings:
+                for msgstr in msgstrs:
                     conflict_marker = gettext.search_for_conflict_marker(msgstr)
                     if conflict_marker is not None:
                         conflict_marker = conflict_marker.group(0)
@@ -874,7 +1085,7 @@ class Checker(metaclass=abc.ABCMeta):
                         break
                 if has_msgstr_plural and not all(message.msgstr_plural.values()):
                     self.tag('partially-translated-message', message_repr(message))
-        if len(msgid_counter) == 0:
+        if not seen_msgids:
             possible_hidden_strings = False
             if ctx.is_binary:
                 possible_hidden_strings = ctx.file.possible_hidden_strings
@@ -887,17 +1098,17 @@ class Checker(metaclass=abc.ABCMeta):
         info.range_min = 0
         info.range_max = 1e999  # +inf
         info.formats = None
-        flags = collections.Counter(message.flags)
+        flags = _count_flags(message.flags)
         wrap = None
         format_flags = collections.defaultdict(dict)
         range_flags = collections.defaultdict(
             collections.Counter
         )
-        for flag, n in sorted(flags.items()):
+        for flag, n in flags:
             known_flag = True
             if flag == 'fuzzy':
                 info.fuzzy = True
-            elif flag in {'wrap', 'no-wrap'}:
+            elif flag in _wrap_flags:
                 new_wrap = flag == 'wrap'
                 if wrap == (not new_wrap):
                     self.tag('conflicting-message-flags',
@@ -909,7 +1120,7 @@ class Checker(metaclass=abc.ABCMeta):
             elif flag.startswith('range:'):
                 if message.msgid_plural is None:
                     self.tag('range-flag-without-plural-string')
-                match = re.match(r'\A([0-9]+)[.][.]([0-9]+)\Z', flag[6:].strip(' \t\r\f\v'))
+                match = _match_range_flag_value(flag[6:].strip(' \t\r\f\v'))
                 if match is not None:
                     i, j = map(int, match.groups())
                     if i < j:
@@ -926,16 +1137,16 @@ class Checker(metaclass=abc.ABCMeta):
                     range_flags[i, j][flag] += n
                     n = 0
             elif flag.endswith('-format'):
-                known_flag = False
-                for prefix in 'no-', 'possible-', 'impossible-', '':
-                    tp = prefix.rstrip('-')
-                    if not flag.startswith(prefix):
-                        continue
-                    string_format = flag[len(prefix):-7]
-                    if string_format in gettext.string_formats:
-                        known_flag = True
-                        format_flags[tp][string_format] = flag
-                        break
+                string_format = flag[:-7]
+                tp = ''
+                (prefix, _, unprefixed_format) = string_format.partition('-')
+                if prefix in _format_flag_prefixes and unprefixed_format in gettext.string_formats:
+                    tp = prefix
+                    string_format = unprefixed_format
+                if string_format in gettext.string_formats:
+                    format_flags[tp][string_format] = flag
+                else:
+                    known_flag = False
             else:
                 known_flag = False
             if not known_flag:
@@ -964,10 +1175,9 @@ class Checker(metaclass=abc.ABCMeta):
                 )
         positive_format_flags = format_flags['']
         info.formats = frozenset(positive_format_flags)
-        for fmt1, flag1 in sorted(positive_format_flags.items()):
-            for fmt2, flag2 in sorted(positive_format_flags.items()):
-                if fmt1 >= fmt2:
-                    continue
+        if len(positive_format_flags) > 1:
+            format_flag_pairs = itertools.combinations(sorted(positive_format_flags.items()), 2)
+            for (fmt1, flag1), (fmt2, flag2) in format_flag_pairs:
                 fmt_ex1 = gettext.string_formats[fmt1]
                 fmt_ex2 = gettext.string_formats[fmt2]
                 if fmt_ex1 & fmt_ex2:
@@ -1005,7 +1215,7 @@ class Checker(metaclass=abc.ABCMeta):
             except KeyError:
                 continue
             checker.check_message(ctx, message, flags)
-        if re.match(r'\Atype: Content of: (<{xmlname}>)+\Z'.format(xmlname=xml.name_re), message.comment or ''):
+        if _match_xml_comment(message.comment or ''):
             self._check_message_xml_format(ctx, message, flags)
 
     def _check_message_xml_format(self, ctx, message, flags):
@@ -1027,12 +1237,20 @@ class Checker(metaclass=abc.ABCMeta):
         except xml.SyntaxError as exc:
             self.tag('malformed-xml', prefix, tags.safestr(exc))
 
-__all__ = ['Checker']
+class _HeaderFields(collections.namedtuple('_HeaderFields', [
+    field.lower().replace('-', '_')
+    for field in sorted(header_fields_with_dedicated_checks)
+])):
 
-def is_header_entry(entry):
-    return (
-        entry.msgid == '' and
-        entry.msgctxt is None
-    )
+    '''
+    values of header fields that have dedicated checks,
+    e.g. values of Plural-Forms are in the plural_forms attribute
+    '''
+
+    __slots__ = ()
+
+    header_field_names = sorted(header_fields_with_dedicated_checks)
+
+__all__ = ['Checker']
 
 # vim:ts=4 sts=4 sw=4 et
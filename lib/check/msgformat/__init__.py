@@ -23,8 +23,16 @@ message format checks
 '''
 
 import abc
+import functools
 import types
 
+# The same msgids are typically seen in many files
+# (one for each language), so cache the parsed format strings.
+# Invalid format strings raise exceptions, which are not cached.
+@functools.lru_cache(maxsize=4096)
+def _parse_msgid(backend, s):
+    return backend.FormatString(s)
+
 class Checker(metaclass=abc.ABCMeta):
 
     def __init__(self, parent):
@@ -47,7 +55,7 @@ class Checker(metaclass=abc.ABCMeta):
                 fmt = self.check_string(ctx, message, s)
             else:
                 try:
-                    fmt = self.backend.FormatString(s)
+                    fmt = _parse_msgid(self.backend, s)
                 except self.backend.Error:
                     # If msgid isn't even a valid format string, then
                     # reporting errors against msgstr is not worth the trouble.
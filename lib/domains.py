@@ -24,6 +24,7 @@ special-use domain names
 
 # https://www.iana.org/assignments/special-use-domain-names/special-use-domain-names.xhtml
 
+import functools
 import re
 
 _regexps = [
@@ -44,6 +45,8 @@ _is_special = re.compile(
     '^({re})$'.format(re='|'.join(_regexps))
 ).match
 
+# The same few domains are typically seen over and over:
+@functools.lru_cache(maxsize=1024)
 def is_special_domain(domain):
     domain = domain.lower()
     return _is_special(domain)
@@ -45,14 +45,8 @@ def _not_implemented(*args, **kwargs):  # no coverage
     del args, kwargs
     raise NotImplementedError
 
-def charmap_encoding(encoding):
-
-    def encode(input, errors='strict'):
-        return codecs.charmap_encode(input, errors, encoding_table)
-
-    def decode(input, errors='strict'):
-        return codecs.charmap_decode(input, errors, decoding_table)
-
+@functools.lru_cache(maxsize=None)
+def _read_charmap(encoding):
     path = os.path.join(paths.datadir, 'charmaps', encoding.upper())
     try:
         file = open(path, 'rb')  # pylint: disable=consider-using-with
@@ -62,6 +56,17 @@ def charmap_encoding(encoding):
         decoding_table = file.read()
     decoding_table = decoding_table.decode('UTF-8')
     encoding_table = codecs.charmap_build(decoding_table)
+    return (decoding_table, encoding_table)
+
+def charmap_encoding(encoding):
+
+    def encode(input, errors='strict'):
+        return codecs.charmap_encode(input, errors, encoding_table)
+
+    def decode(input, errors='strict'):
+        return codecs.charmap_decode(input, errors, decoding_table)
+
+    (decoding_table, encoding_table) = _read_charmap(encoding)
 
     return codecs.CodecInfo(
         encode=encode,
@@ -177,6 +182,7 @@ def is_portable_encoding(encoding, python=True):
     else:
         return encoding in _portable_encodings
 
+@functools.lru_cache(maxsize=256)
 def propose_portable_encoding(encoding, python=True):
     del python  # never used; only encodings supported by Python are proposed
     try:
@@ -187,11 +193,13 @@ def propose_portable_encoding(encoding, python=True):
     assert is_portable_encoding(new_encoding, python=True)
     return new_encoding.upper()
 
+@functools.lru_cache(maxsize=256)
 def is_ascii_compatible_encoding(encoding, *, missing_ok=True):
     try:
-        decoded_ascii_bytes = _interesting_ascii_bytes.decode(encoding)
-        if isinstance(decoded_ascii_bytes, bytes):
-            # may happen on PyPy for non-text encodings
+        codec = codecs.lookup(encoding)
+        (decoded_ascii_bytes, _) = codec.decode(_interesting_ascii_bytes)
+        if not isinstance(decoded_ascii_bytes, str):
+            # non-text encodings
             raise RuntimeError
         return decoded_ascii_bytes == _interesting_ascii_str
     except UnicodeDecodeError:
@@ -205,6 +213,10 @@ def is_ascii_compatible_encoding(encoding, *, missing_ok=True):
     else:
         raise EncodingLookupError(encoding)
 
+# Python caches only successful codec lookups,
+# so the search function would be called again for every unknown encoding.
+# The names come from the checked files, so keep the cache bounded:
+@functools.lru_cache(maxsize=256)
 def _codec_search_function(encoding):
     encoding = _unmangle_encoding.get(encoding, encoding)
     if _portable_encodings.get(encoding, False) is None:
@@ -224,6 +236,9 @@ def _codec_search_function(encoding):
 @functools.lru_cache(maxsize=1)
 def install_extra_encodings():
     codecs.register(_codec_search_function)
+    # Results for the newly available encodings may have changed:
+    propose_portable_encoding.cache_clear()
+    is_ascii_compatible_encoding.cache_clear()
     for enc_name in _portable_encodings:
         if enc_name.startswith('iso-'):
             suffix = enc_name[4:].replace('-', '_')
@@ -28,6 +28,7 @@ gettext header support:
 
 import configparser
 import datetime
+import functools
 import os
 import re
 
@@ -55,18 +56,22 @@ header_fields = _read_header_fields()
 # header and message parsing
 # ==========================
 
-is_valid_field_name = re.compile(r'^[\x21-\x39\x3B-\x7E]+$').match
+_field_name_re = r'[\x21-\x39\x3B-\x7E]+'
 # https://tools.ietf.org/html/rfc5322#section-3.6.8
 
+is_valid_field_name = re.compile('^' + _field_name_re + '$').match
+
+_match_header_field = re.compile('(' + _field_name_re + '):(.*)', re.DOTALL).match
+
 def parse_header(s):
     lines = s.split('\n')
     if lines[-1] == '':
         lines.pop()
     for line in lines:
-        key, *values = line.split(':', 1)
-        if values and is_valid_field_name(key):
-            assert len(values) == 1
-            value = values[0].strip(' \t')
+        match = _match_header_field(line)
+        if match is not None:
+            (key, value) = match.groups()
+            value = value.strip(' \t')
             yield {key: value}
         else:
             yield line
@@ -96,6 +101,10 @@ def parse_plural_expression(s):
 
 _parse_plural_forms = re.compile(r'nplurals=([1-9][0-9]*);[ \t]*plural=([^;]+);?').search
 
+# Most files use one of only a handful of distinct Plural-Forms,
+# so cache the parsed expressions.
+# (Syntax errors are not cached, but they are rare.)
+@functools.lru_cache(maxsize=128)
 def parse_plural_forms(s, strict=True):
     match = _parse_plural_forms(s)
     if match is None:
@@ -123,19 +132,23 @@ class DateSyntaxError(Exception):
 class BoilerplateDate(DateSyntaxError):
     pass
 
+# Timezone abbreviations are rare in PO files,
+# so the data file is read only when one is seen.
+@functools.lru_cache(maxsize=None)
 def _read_timezones():
     path = os.path.join(paths.datadir, 'timezones')
     cp = configparser.ConfigParser(interpolation=None, default_section='')
     cp.optionxform = str
     cp.read(path, encoding='ASCII')
-    return {
-        abbrev: offsets.split()
-        for abbrev, offsets in cp['timezones'].items()
-    }
-
-_timezones = _read_timezones()
+    timezones = {}
+    for abbrev, offsets in cp['timezones'].items():
+        offsets = offsets.split()
+        if len(offsets) == 1:
+            [timezones[abbrev]] = offsets
+        else:
+            timezones[abbrev] = None  # ambiguous
+    return timezones
 
-_tz_re = '|'.join(re.escape(tz) for tz in _timezones)
 _parse_date = re.compile(r'''
     ^
     ( [0-9]{4}-[0-9]{2}-[0-9]{2} )  # YYYY-MM-DD
@@ -145,7 +158,7 @@ _parse_date = re.compile(r'''
     \s*
     (?:
       (?: GMT | UTC )? ( [+-] [0-9]{2} ) :? ( [0-9]{2} )  # ZZzz
-    | [+]? (''' + _tz_re + ''')
+    | [+]? ( [A-Za-z]+ )  # timezone abbreviation
     ) ?
     $
 ''', re.VERBOSE).match
@@ -175,18 +188,40 @@ def fix_date_format(s, *, tz_hint=None):
         zone = zhour + zminute
     elif zabbr is not None:
         try:
-            [zone] = _timezones[zabbr]
-        except ValueError:
+            zone = _read_timezones()[zabbr]
+        except KeyError:
+            raise DateSyntaxError('unknown timezone abbreviation: ' + zabbr)
+        if zone is None:
             raise DateSyntaxError('ambiguous timezone abbreviation: ' + zabbr)
     elif tz_hint is not None:
         zone = tz_hint
     else:
         raise DateSyntaxError
-    s = '{} {}{}'.format(date, time, zone)
+    s = date + ' ' + time + zone
     assert len(s) == 21, 'len({!r}) != 21'.format(s)
-    parse_date(s)  # just check syntax
+    _check_date(date, time, zone)
     return s
 
+def _check_date(date, time, zone):
+    '''
+    check syntax of the date fixed by fix_date_format();
+    the same as parse_date(), but much faster than strptime()
+    '''
+    try:
+        zminute = int(zone[3:5])
+        if zminute >= 60:
+            raise ValueError('invalid timezone offset: ' + zone)
+        offset = datetime.timedelta(hours=int(zone[1:3]), minutes=zminute)
+        if zone[0] == '-':
+            offset = -offset
+        datetime.datetime(
+            int(date[0:4]), int(date[5:7]), int(date[8:10]),
+            int(time[0:2]), int(time[3:5]),
+            tzinfo=datetime.timezone(offset),
+        )
+    except ValueError as exc:
+        raise DateSyntaxError(exc)
+
 def parse_date(s):
     try:
         return datetime.datetime.strptime(s, '%Y-%m-%d %H:%M%z')
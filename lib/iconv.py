@@ -33,6 +33,8 @@ default_encoding = sys.getdefaultencoding()
 
 _boring_iconv_stderr = re.compile('\nTry .+ for more information[.]$')
 
+_search_for_ascii = re.compile(b'[\x00-\x7F]').search
+
 _libc = ctypes.CDLL(None, use_errno=True)
 try:
     _iconv_open = _libc.iconv_open
@@ -197,11 +199,11 @@ def _decode_dl(input: bytes, *, encoding):
                     continue
                 elif rc in {errno.EILSEQ, errno.EINVAL}:
                     begin = len(input) - inbytesleft.value
-                    for end in range(begin + 1, len(input)):
-                        # Assume that the encoding can be synchronized on ASCII characters.
-                        # That's not necessarily true for _every_ encoding, but oh well.
-                        if input[end] < 0x80:
-                            break
+                    # Assume that the encoding can be synchronized on ASCII characters.
+                    # That's not necessarily true for _every_ encoding, but oh well.
+                    match = _search_for_ascii(input, begin + 1)
+                    if match is not None:
+                        end = match.start()
                     else:
                         end = len(input)
                     raise UnicodeDecodeError(
@@ -24,16 +24,52 @@ C integer expressions
 
 import ast
 import functools
+import re
 import types
 
 import rply
 import rply.errors
+import rply.token
 
 LexingError = rply.errors.LexingError
 ParsingError = rply.errors.ParsingError
 
 # https://git.savannah.gnu.org/cgit/gettext.git/tree/gettext-runtime/intl/plural.y?id=v0.18.3#n132
 
+class Lexer():
+
+    '''
+    drop-in replacement for the RPLY lexer
+
+    The RPLY lexer tries every rule in turn at every position.
+    Here all the rules are combined into a single regexp,
+    and the matching rule is determined by match.lastgroup.
+    '''
+
+    def __init__(self, rules, ignore_rules):
+        self.rules = rules
+        self.ignore_rules = ignore_rules
+        regexps = [
+            '(?:{re})'.format(re=rule.re.pattern)
+            for rule in ignore_rules
+        ]
+        regexps += [
+            '(?P<{name}>{re})'.format(name=rule.name, re=rule.re.pattern)
+            for rule in rules
+        ]
+        self._match = re.compile('|'.join(regexps)).match
+
+    def lex(self, s):
+        i = 0
+        while i < len(s):
+            match = self._match(s, i)
+            source_pos = rply.token.SourcePosition(i, 1, i + 1)
+            if match is None:
+                raise LexingError(None, source_pos)
+            if match.lastgroup is not None:
+                yield rply.Token(match.lastgroup, match.group(), source_pos)
+            i = match.end()
+
 @functools.lru_cache(maxsize=None)
 def create_lexer():
     lg = rply.LexerGenerator()
@@ -51,109 +87,146 @@ def create_lexer():
     lg.add('VAR', r'n')
     lg.add('INT', r'[0-9]+')
     lg.ignore(r'[ \t]+')
-    return lg.build()
-
-@functools.lru_cache(maxsize=None)
-def create_parser(lexer):
-    pg = rply.ParserGenerator(
-        [rule.name for rule in lexer.rules],
-        precedence=[
-            ('right', ['IF', 'ELSE']),
-            ('left', ['OR']),
-            ('left', ['AND']),
-            ('left', ['EQ']),
-            ('left', ['CMP']),
-            ('left', ['ADDSUB']),
-            ('left', ['MULDIV']),
-            ('right', ['NOT']),
-        ],
-        cache_id='i18nspector-intexpr',
-    )
-    ast_bool = {
-        '&&': ast.And(),
-        '||': ast.Or(),
-    }
-    ast_cmp = {
-        '==': ast.Eq(),
-        '!=': ast.NotEq(),
-        '<': ast.Lt(),
-        '<=': ast.LtE(),
-        '>': ast.Gt(),
-        '>=': ast.GtE(),
-    }
-    ast_arithmetic = {
-        '+': ast.Add(),
-        '-': ast.Sub(),
-        '*': ast.Mult(),
-        '/': ast.Div(),
-        '%': ast.Mod(),
-    }
-    ast_not = ast.Not()
-    # pylint: disable=unused-variable
-    @pg.production('start : exp')
-    def eval_start(p):
-        [exp] = p
-        return ast.Expr(exp)
-    @pg.production('exp : exp IF exp ELSE exp')
-    def expr_ifelse(p):
-        [cond, _, body, _, orelse] = p
-        return ast.IfExp(cond, body, orelse)
-    @pg.production('exp : exp OR exp')
-    @pg.production('exp : exp AND exp')
-    def expr_bool(p):
-        [left, tok, right] = p
-        op = ast_bool[tok.getstr()]
-        return ast.BoolOp(op, [left, right])
-    @pg.production('exp : exp EQ exp')
-    @pg.production('exp : exp CMP exp')
-    def expr_cmp(p):
-        [left, tok, right] = p
-        op = ast_cmp[tok.getstr()]
-        return ast.Compare(left, [op], [right])
-    @pg.production('exp : exp ADDSUB exp')
-    @pg.production('exp : exp MULDIV exp')
-    def expr_arithmetic(p):
-        [left, tok, right] = p
-        op = ast_arithmetic[tok.getstr()]
-        return ast.BinOp(left, op, right)
-    @pg.production('exp : NOT exp')
-    def expr_not(p):
-        [_, value] = p
-        return ast.UnaryOp(ast_not, value)
-    @pg.production('exp : LPAR exp RPAR')
-    def expr_par(p):
-        [_, exp, _] = p
-        return exp
-    @pg.production('exp : VAR')
-    def expr_var(p):
-        [tok] = p
-        ident = tok.getstr()
-        assert ident == 'n'
-        return ast.Name(ident, ast.Load())
-    @pg.production('exp : INT')
-    def expr_int(p):
-        [tok] = p
-        n = int(tok.getstr())
-        return ast.Num(n)
-    # pylint: enable=unused-variable
-    with misc.throwaway_tempdir('rply'):
-        # Use private temporary directory
-        # to mitigate RPLY's insecure use of /tmp:
-        # CVE-2014-1604, CVE-2014-1938
-        return pg.build()
+    lexer = lg.build()
+    return Lexer(lexer.rules, lexer.ignore_rules)
+
+_ast_bool = {
+    '&&': ast.And(),
+    '||': ast.Or(),
+}
+
+_ast_cmp = {
+    '==': ast.Eq(),
+    '!=': ast.NotEq(),
+    '<': ast.Lt(),
+    '<=': ast.LtE(),
+    '>': ast.Gt(),
+    '>=': ast.GtE(),
+}
+
+_ast_arithmetic = {
+    '+': ast.Add(),
+    '-': ast.Sub(),
+    '*': ast.Mult(),
+    '/': ast.Div(),
+    '%': ast.Mod(),
+}
+
+_ast_not = ast.Not()
+
+# binding power of binary operators;
+# all of them are left-associative:
+_binary_precedence = dict(
+    OR=2,
+    AND=3,
+    EQ=4,
+    CMP=5,
+    ADDSUB=6,
+    MULDIV=7,
+)
+# The conditional operator (right-associative) binds weaker than any of them,
+# and the logical negation (prefix) binds stronger than any of them:
+_ifelse_precedence = 1
+_not_precedence = 8
+
+def _make_binary_node(tok, left, right):
+    s = tok.getstr()
+    name = tok.gettokentype()
+    if name in {'OR', 'AND'}:
+        return ast.BoolOp(_ast_bool[s], [left, right])
+    elif name in {'EQ', 'CMP'}:
+        return ast.Compare(left, [_ast_cmp[s]], [right])
+    else:
+        return ast.BinOp(left, _ast_arithmetic[s], right)
 
 class Parser():
 
+    '''
+    operator-precedence parser
+
+    Operators and operands are kept on explicit stacks,
+    so that deeply nested expressions don't exhaust the Python stack.
+    '''
+
     def __init__(self):
         self._lexer = create_lexer()
-        self._parser = create_parser(self._lexer)
 
     def parse(self, s):
-        tokens = self._lexer.lex(s)
-        node = self._parser.parse(tokens)
-        return Expression(node)
-
-from lib import misc  # pylint: disable=wrong-import-position
+        operators = []  # (token, precedence) pairs
+        operands = []
+        def reduce():
+            (tok, _) = operators.pop()
+            name = tok.gettokentype()
+            if name == 'NOT':
+                value = operands.pop()
+                operands.append(ast.UnaryOp(_ast_not, value))
+            elif name == 'ELSE':
+                orelse = operands.pop()
+                body = operands.pop()
+                cond = operands.pop()
+                operands.append(ast.IfExp(cond, body, orelse))
+            else:
+                right = operands.pop()
+                left = operands.pop()
+                operands.append(_make_binary_node(tok, left, right))
+        def reduce_while(min_precedence):
+            # “(” and unmatched “?” have precedence 0,
+            # so reducing always stops at them:
+            while operators and operators[-1][1] >= min_precedence:
+                reduce()
+        def error(tok=None):
+            source_pos = tok.getsourcepos() if tok is not None else None
+            return ParsingError(None, source_pos)
+        expect_operand = True
+        for tok in self._lexer.lex(s):
+            name = tok.gettokentype()
+            if expect_operand:
+                if name == 'VAR':
+                    ident = tok.getstr()
+                    assert ident == 'n'
+                    operands.append(ast.Name(ident, ast.Load()))
+                    expect_operand = False
+                elif name == 'INT':
+                    n = int(tok.getstr())
+                    operands.append(ast.Num(n))
+                    expect_operand = False
+                elif name == 'NOT':
+                    operators.append((tok, _not_precedence))
+                elif name == 'LPAR':
+                    operators.append((tok, 0))
+                else:
+                    raise error(tok)
+            elif name in _binary_precedence:
+                precedence = _binary_precedence[name]
+                reduce_while(precedence)
+                operators.append((tok, precedence))
+                expect_operand = True
+            elif name == 'IF':
+                reduce_while(_ifelse_precedence + 1)
+                operators.append((tok, 0))
+                expect_operand = True
+            elif name == 'ELSE':
+                reduce_while(1)
+                if not operators or operators[-1][0].gettokentype() != 'IF':
+                    raise error(tok)
+                operators[-1] = (tok, _ifelse_precedence)
+                expect_operand = True
+            elif name == 'RPAR':
+                reduce_while(1)
+                if not operators or operators[-1][0].gettokentype() != 'LPAR':
+                    raise error(tok)
+                operators.pop()
+            else:
+                raise error(tok)
+        if expect_operand:
+            raise error()
+        reduce_while(1)
+        if operators:
+            raise error()
+        # The checks above guarantee that exactly one operand is left:
+        node = operands.pop()
+        assert not operands
+        return Expression(ast.Expr(node))
 
 class BaseEvaluator():
 
@@ -229,6 +302,9 @@ class Evaluator(BaseEvaluator):
         self._ctxt.n = n
         self._ctxt.max = 1 << bits
 
+    def set_n(self, n):
+        self._ctxt.n = n
+
     def _check_overflow(self, n):
         if n < 0:
             raise OverflowError(n)
@@ -302,11 +378,15 @@ class Evaluator(BaseEvaluator):
     # =======================
 
     def _visit_ifexp(self, node):
-        test = self._visit(node.test)
-        if test:
-            return self._visit(node.body)
-        else:
-            return self._visit(node.orelse)
+        # Walk nested conditionals iteratively,
+        # so that long “a ? b : c ? d : …” chains don't exhaust the stack.
+        while isinstance(node, ast.IfExp):
+            test = self._visit(node.test)
+            if test:
+                node = node.body
+            else:
+                node = node.orelse
+        return self._visit(node)
 
     # constants, variables
     # ====================
@@ -486,22 +566,37 @@ class CodomainEvaluator(BaseEvaluator):
     # =======================
 
     def _visit_ifexp(self, node):
-        test = self._visit(node.test)
-        if test is None:
+        # Walk “a ? b : c ? d : …” chains iteratively,
+        # so that they don't exhaust the stack.
+        xs = []
+        y = None
+        while True:
+            test = self._visit(node.test)
+            if test is None:
+                break
+            x = None
+            if test[1] > 0:
+                x = self._visit(node.body)
+            xs += [x]
+            if test[0] != 0:
+                break
+            node = node.orelse
+            if not isinstance(node, ast.IfExp):
+                y = self._visit(node)
+                break
+        if not xs:
             return
-        x = y = None
-        if test[1] > 0:
-            x = self._visit(node.body)
-        if test[0] == 0:
-            y = self._visit(node.orelse)
-        if x is None:
-            return y
-        if y is None:
-            return x
-        return (
-            min(x[0], y[0]),
-            max(x[1], y[1]),
-        )
+        for x in reversed(xs):
+            if x is None:
+                continue
+            if y is None:
+                y = x
+                continue
+            y = (
+                min(x[0], y[0]),
+                max(x[1], y[1]),
+            )
+        return y
 
     # constants, variables
     # ====================
@@ -519,6 +614,104 @@ class CodomainEvaluator(BaseEvaluator):
 
     # pylint: enable=unused-argument
 
+class Compiler(BaseEvaluator):
+
+    '''
+    translate the expression into Python source code
+    '''
+
+    def __init__(self, node, *, bits):
+        super().__init__(node)
+        self._ctxt.max = 1 << bits
+
+    # pylint: disable=unused-argument
+
+    # binary operators
+    # ================
+
+    def _visit_add(self, node, x, y):
+        return '_check({x} + {y})'.format(x=x, y=y)
+
+    def _visit_sub(self, node, x, y):
+        return '_check({x} - {y})'.format(x=x, y=y)
+
+    def _visit_mult(self, node, x, y):
+        return '_check({x} * {y})'.format(x=x, y=y)
+
+    def _visit_div(self, node, x, y):
+        return '({x} // {y})'.format(x=x, y=y)
+
+    def _visit_mod(self, node, x, y):
+        return '({x} % {y})'.format(x=x, y=y)
+
+    # unary operators
+    # ===============
+
+    def _visit_not(self, node, x):
+        return '(0 if {x} else 1)'.format(x=x)
+
+    # comparison operators
+    # ====================
+
+    def _cmp(op):  # pylint: disable=no-self-argument
+        def visit(self, node, x, y):
+            return '(1 if {x} {op} {y} else 0)'.format(x=x, op=op, y=y)
+        return visit
+
+    _visit_gte = _cmp('>=')
+    _visit_gt = _cmp('>')
+    _visit_lte = _cmp('<=')
+    _visit_lt = _cmp('<')
+    _visit_eq = _cmp('==')
+    _visit_noteq = _cmp('!=')
+
+    del _cmp
+
+    # boolean operators
+    # =================
+
+    def _visit_and(self, node, *args):
+        return '(1 if {} else 0)'.format(
+            ' and '.join(map(self._visit, args))
+        )
+
+    def _visit_or(self, node, *args):
+        return '(1 if {} else 0)'.format(
+            ' or '.join(map(self._visit, args))
+        )
+
+    # if-then-else expression
+    # =======================
+
+    def _visit_ifexp(self, node):
+        # Python's conditional expressions are right-associative,
+        # so “a ? b : c ? d : …” chains don't need nested parentheses.
+        parts = []
+        while isinstance(node, ast.IfExp):
+            parts += ['{body} if {test}'.format(
+                test=self._visit(node.test),
+                body=self._visit(node.body),
+            )]
+            node = node.orelse
+        parts += [self._visit(node)]
+        return '(' + ' else '.join(parts) + ')'
+
+    # constants, variables
+    # ====================
+
+    def _visit_num(self, node):
+        n = node.n
+        if 0 <= n < self._ctxt.max:
+            return str(n)
+        return '_check({n})'.format(n=n)
+
+    _visit_constant = _visit_num
+
+    def _visit_name(self, node):
+        return '(n if 0 <= n < {max} else _check(n))'.format(max=self._ctxt.max)
+
+    # pylint: enable=unused-argument
+
 def gcd(x, y):
     while y:
         (x, y) = (y, x % y)
@@ -643,24 +836,24 @@ class PeriodEvaluator(BaseEvaluator):
     # =======================
 
     def _visit_ifexp(self, node):
-        test = self._visit(node.test)
-        if test is None:
-            return
-        (to, tp) = test
-        x = self._visit(node.body)
-        if x is None:
-            return
-        (xo, xp) = x
-        y = self._visit(node.orelse)
-        if y is None:
-            return
-        (yo, yp) = y
-        ro = max(to, xo, yo)
-        rp = lcm(tp, xp, yp)
-        if rp >= self._ctxt.max:
-            return
-        else:
-            return (ro, rp)
+        # Walk “a ? b : c ? d : …” chains iteratively,
+        # so that they don't exhaust the stack.
+        subnodes = []
+        while isinstance(node, ast.IfExp):
+            subnodes += [node.test, node.body]
+            node = node.orelse
+        subnodes += [node]
+        (ro, rp) = (0, 1)
+        for subnode in subnodes:
+            x = self._visit(subnode)
+            if x is None:
+                return
+            (xo, xp) = x
+            ro = max(ro, xo)
+            rp = lcm(rp, xp)
+            if rp >= self._ctxt.max:
+                return
+        return (ro, rp)
 
     # constants, variables
     # ====================
@@ -690,6 +883,32 @@ class Expression():
         e = Evaluator(self._node, n, bits=bits)
         return e()
 
+    def evaluator(self, *, bits=32):
+        '''
+        return function f, such that f(n) == self(n)
+
+        The function is cheaper to call many times in a row
+        than the expression itself.
+        '''
+        max_ = 1 << bits
+        def check(n):
+            if n < 0:
+                raise OverflowError(n)
+            if n >= max_:
+                raise OverflowError(n)
+            return n
+        try:
+            source = 'lambda n: ' + Compiler(self._node, bits=bits)()
+            return eval(source, {'__builtins__': {}, '_check': check})  # pylint: disable=eval-used
+        except (SyntaxError, RuntimeError, MemoryError):  # no coverage
+            # The expression is too deeply nested for the Python compiler.
+            pass
+        e = Evaluator(self._node, None, bits=bits)
+        def f(n):
+            e.set_n(n)
+            return e()
+        return f
+
     def codomain(self, *, bits=32):
         '''
         return
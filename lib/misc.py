@@ -22,9 +22,9 @@
 miscellanea
 '''
 
+import collections
 import contextlib
 import datetime
-import tempfile
 
 def unsorted(iterable):
     '''
@@ -58,6 +58,12 @@ def sorted_vk(d):
         del k
         yield v
 
+def unique(iterable):
+    '''
+    return list of unique items, in the order of their first occurrence
+    '''
+    return list(collections.OrderedDict.fromkeys(iterable))
+
 def utc_now():
     '''
     timezone-aware variant of datetime.now()
@@ -79,14 +85,34 @@ def format_range(rng, *, max):  # pylint: disable=redefined-builtin
             break
     return ', '.join(map(str, result))
 
+_preloaded_files = {}
+
 @contextlib.contextmanager
-def throwaway_tempdir(context):
-    with tempfile.TemporaryDirectory(prefix='i18nspector.{}.'.format(context)) as new_tempdir:
-        original_tempdir = tempfile.tempdir
-        try:
-            tempfile.tempdir = new_tempdir
-            yield
-        finally:
-            tempfile.tempdir = original_tempdir
+def preloaded_file(path, contents):
+    '''
+    make read_file(path) return contents within the context
+    '''
+    _preloaded_files[path] = contents
+    try:
+        yield
+    finally:
+        del _preloaded_files[path]
+
+def get_preloaded_file(path):
+    '''
+    return contents preloaded with preloaded_file(), or None
+    '''
+    return _preloaded_files.get(path)
+
+def read_file(path):
+    '''
+    return contents of the file,
+    unless it was preloaded with preloaded_file()
+    '''
+    contents = get_preloaded_file(path)
+    if contents is not None:
+        return contents
+    with open(path, 'rb') as file:
+        return file.read()
 
 # vim:ts=4 sts=4 sw=4 et
@@ -33,6 +33,7 @@ import struct
 import polib
 
 from lib import encodings
+from lib import misc
 
 little_endian_magic = b'\xDE\x12\x04\x95'
 big_endian_magic = little_endian_magic[::-1]
@@ -46,8 +47,7 @@ class Parser():
         self._encoding = encoding
         if check_for_duplicates:
             raise NotImplementedError
-        with open(path, 'rb') as file:
-            contents = file.read()
+        contents = misc.read_file(path)
         view = memoryview(contents)
         view = view.cast('c')
         if len(view) > 0:
@@ -31,6 +31,7 @@ import re
 import polib
 
 from lib import encodings
+from lib import misc
 from lib import moparser
 
 # pylint: disable=protected-access
@@ -76,8 +77,7 @@ class Codecs():
             raise NotImplementedError
         if not encodings.is_ascii_compatible_encoding(encoding):
             encoding = 'ASCII'
-        with open(path, 'rb') as file:
-            contents = file.read()
+        contents = misc.read_file(path)
         contents = contents.decode(encoding)
         pending_comments = []
         empty = True
@@ -164,13 +164,33 @@ def mo_parser_patch():
 # =======================
 # Don't use polib's detect_encoding() for MO files, as i18nspector's own MO
 # file parser has built-in encoding detection.
+# For preloaded PO files, don't read them from disk again; search the
+# contents line by line, as polib would do.
+
+_search_for_charset = re.compile(br'"?Content-Type:.+? charset=([\w_\-:\.]+)').search
+
+def _detect_encoding(contents):
+    for line in contents.split(b'\n'):
+        match = _search_for_charset(line)
+        if match is None:
+            continue
+        encoding = match.group(1).strip().decode('ASCII')
+        try:
+            codecs.lookup(encoding)
+        except LookupError:
+            continue
+        return encoding
+    return polib.default_encoding
 
 @register_patch
 def detect_encoding_patch():
     def detect_encoding(path, binary_mode=False):
         if binary_mode:
             return
-        return original(path)
+        contents = misc.get_preloaded_file(path)
+        if contents is None:
+            return original(path)
+        return _detect_encoding(contents)
     original = polib.detect_encoding
     polib.detect_encoding = detect_encoding
 
@@ -24,14 +24,18 @@ Perl format checks: Locale::TextDomain
 
 import re
 
-_field_re = re.compile(r'''
+_field_pattern = r'''
     (?P<literal> [^{]+ ) |
     (?:
         [{]
             (?P<name> [^\W\d]\w* )
         [}]
     )
-''', re.VERBOSE)
+'''
+
+_find_fields = re.compile(_field_pattern, re.VERBOSE).findall
+
+_match_fields = re.compile('(?:' + _field_pattern + ')*', re.VERBOSE).match
 
 def _printable_prefix(s, r=re.compile('[ -\x7E]+')):
     return r.match(s).group()
@@ -42,24 +46,19 @@ class Error(Exception):
 class FormatString():
 
     def __init__(self, s):
-        self._items = items = []
-        arguments = set()
-        last_pos = 0
-        for match in _field_re.finditer(s):
-            if match.start() != last_pos:
-                raise Error(
-                    _printable_prefix(s[last_pos:])
-                )
-            items += [match.group()]
-            argname = match.group('name')
-            if argname is not None:
-                arguments.add(argname)
-            last_pos = match.end()
+        last_pos = _match_fields(s).end()
         if last_pos != len(s):
             raise Error(
                 _printable_prefix(s[last_pos:])
             )
-        self.arguments = frozenset(arguments)
+        fields = _find_fields(s)
+        self._items = [
+            literal or '{' + name + '}'
+            for literal, name in fields
+        ]
+        self.arguments = frozenset(
+            name for literal, name in fields if name
+        )
 
     def __iter__(self):
         return iter(self._items)
@@ -35,18 +35,24 @@ from lib import terminal
 @functools.total_ordering
 class OrderedEnum(enum.Enum):
 
+    # Enum.value is a descriptor, which is slow to access;
+    # use the underlying _value_ attribute instead.
+    # pylint: disable=protected-access,no-member
+
     def __lt__(self, other):
         if not type(self) is type(other):
             return NotImplemented
-        return self.value < other.value  # pylint: disable=comparison-with-callable
+        return self._value_ < other._value_
 
     def __eq__(self, other):
         if not type(self) is type(other):
             return NotImplemented
-        return self.value == other.value  # pylint: disable=comparison-with-callable
+        return self._value_ == other._value_
 
     def __hash__(self):  # pylint: disable=invalid-hash-returned
-        return self.value
+        return self._value_
+
+    # pylint: enable=protected-access,no-member
 
 severities = OrderedEnum('Severity', [
     'pedantic',
@@ -63,6 +69,35 @@ certainties = OrderedEnum('Certainty', [
     'certain',
 ])
 
+def _get_priority(s, c):
+    S = severities
+    C = certainties
+    # pylint: disable=no-member
+    return {
+        S.pedantic: 'P',
+        S.wishlist: 'I',
+        S.minor: 'IW'[c >= C.certain],
+        S.normal: 'IW'[c >= C.possible],
+        S.important: 'WE'[c >= C.possible],
+        S.serious: 'E',
+    }[s]
+    # pylint: enable=no-member
+
+_priorities = {
+    (s, c): _get_priority(s, c)
+    for s in severities
+    for c in certainties
+}
+
+# The color values are known only after the terminal is initialized,
+# so only their names can be stored here:
+_priority_colors = dict(
+    P='green',
+    I='cyan',
+    W='yellow',
+    E='red',
+)
+
 class InvalidSeverity(misc.DataIntegrityError):
     pass
 
@@ -97,15 +132,16 @@ def safe_format(template, *args, **kwargs):
 
 class Tag():
 
-    def __init__(self, **kwargs):
+    def __init__(self, name, severity, certainty, *, description=None, references=None):
         self.description = None
         self.references = []
-        for k, v in kwargs.items():
-            try:
-                getattr(self, '_set_' + k)(v)
-            except AttributeError:
-                raise UnknownField(k)
-        type({self.name, self.severity, self.certainty})
+        self._set_name(name)
+        self._set_severity(severity)
+        self._set_certainty(certainty)
+        if description is not None:
+            self._set_description(description)
+        if references is not None:
+            self._set_references(references)
 
     # pylint: disable=attribute-defined-outside-init
 
@@ -149,49 +185,31 @@ class Tag():
 
     def get_colors(self):
         prio = self.get_priority()
-        n = dict(
-            P=terminal.colors.green,
-            I=terminal.colors.cyan,
-            W=terminal.colors.yellow,
-            E=terminal.colors.red,
-        )[prio]
+        n = getattr(terminal.colors, _priority_colors[prio])
         return (
             terminal.attr_fg(n),
             terminal.attr_reset()
         )
 
     def get_priority(self):
-        s = self.severity
-        S = severities
-        c = self.certainty
-        C = certainties
-        # pylint: disable=no-member
-        return {
-            S.pedantic: 'P',
-            S.wishlist: 'I',
-            S.minor: 'IW'[c >= C.certain],
-            S.normal: 'IW'[c >= C.possible],
-            S.important: 'WE'[c >= C.possible],
-            S.serious: 'E',
-        }[s]
-        # pylint: enable=no-member
+        return _priorities[self.severity, self.certainty]
 
     def format(self, target, *extra, color=False):
-        if color:
-            color_on, color_off = self.get_colors()
-        else:
-            color_on = color_off = ''
-        s = '{prio}: {target}: {on}{tag}{off}'.format(
+        prefix = '{prio}: {target}: '.format(
             prio=self.get_priority(),
             target=target,
-            tag=self.name,
-            on=color_on,
-            off=color_off,
         )
+        if color:
+            color_on, color_off = self.get_colors()
+            s = prefix + color_on + self.name + color_off
+        else:
+            s = prefix + self.name
         if extra:
             s += ' ' + ' '.join(map(_escape, extra))
         return s
 
+_tag_fields = frozenset({'severity', 'certainty', 'description', 'references'})
+
 def _read_tags():
     path = os.path.join(paths.datadir, 'tags')
     cp = configparser.ConfigParser(interpolation=None, default_section='')
@@ -201,9 +219,15 @@ def _read_tags():
     for tagname, section in cp.items():
         if not tagname:
             continue
-        kwargs = dict(section.items())
-        kwargs['name'] = tagname
-        tags[tagname] = Tag(**kwargs)
+        for key in section:
+            if key not in _tag_fields:
+                raise UnknownField(key)
+        tags[tagname] = Tag(tagname,
+            section['severity'],
+            section['certainty'],
+            description=section.get('description'),
+            references=section.get('references'),
+        )
     return tags
 
 _tags = _read_tags()
@@ -227,6 +227,15 @@ class test_plural_exp:
     def test_nested_conditional(self):
         self.t('(2 ? 3 : 7) ? 23 : 37')
 
+    def test_long_conditional_chain(self):
+        s = ''.join('n == {0} ? {0} : '.format(i) for i in range(2000)) + '2000'
+        self.t(s, 1999, 1999)
+        self.t(s, 5000, 2000)
+
+    def test_deeply_nested_parentheses(self):
+        s = '(' * 5000 + 'n' + ')' * 5000
+        self.t(s, 42, 42)
+
     def test_badly_nested_conditional(self):
         with assert_raises(self.error):
             self.t('2 ? (3 : 7 ? ) : 23')
@@ -299,6 +308,16 @@ class test_plural_exp:
         with assert_raises(self.error):
             self.t(' ')
 
+class test_plural_exp_evaluator(test_plural_exp):
+
+    def t(self, s, n=None, fn=None):
+        f = M.parse_plural_expression(s)
+        f = f.evaluator()
+        if n is not None:
+            assert_is_not_none(fn)
+            assert_equal(f(n), fn)
+            assert_equal(f(n), fn)  # evaluator can be reused
+
 class test_codomain:
 
     def t(self, s, min_, max_=None):
@@ -523,6 +542,10 @@ class test_codomain:
             6, 37 + 7 - 1
         )
 
+    def test_cond_long_chain(self):
+        s = ''.join('n == {0} ? {0} : '.format(i) for i in range(2000)) + '2000'
+        self.t(s, 0, 2000)
+
 class test_period:
 
     def t(self, s, offset, period=None):
@@ -593,6 +616,10 @@ class test_period:
         self.t('(n % 2) ? (n % 3) : (n % 7)', 0, 42)
         self.t('(n % 2) ? (n % 3) : (n % 715827883)', None)  # overflow
 
+    def test_ifexp_long_chain(self):
+        s = ''.join('n == {0} ? {0} : '.format(i) for i in range(2000)) + '2000'
+        self.t(s, 2000, 1)
+
     def test_num_overflow(self):
         m = (1 << 32) - 1
         self.t(str(m), 0, 1)
@@ -20,8 +20,6 @@
 
 import datetime
 import os
-import stat
-import tempfile
 import time
 
 from nose.tools import (
@@ -30,7 +28,6 @@ from nose.tools import (
     assert_is_instance,
     assert_is_not_none,
     assert_raises,
-    assert_true,
 )
 
 import lib.misc as M
@@ -91,6 +88,12 @@ def test_sorted_vk():
         list(M.sorted_vk(d))
     )
 
+def test_unique():
+    assert_equal(
+        M.unique(['spam', 'eggs', 'spam', 'ham', 'eggs']),
+        ['spam', 'eggs', 'ham'],
+    )
+
 class test_utc_now:
 
     def test_types(self):
@@ -135,11 +138,14 @@ class test_format_range:
     def test_huge(self):
         self.t(5, 42 ** 17, 5, '5, 6, 7, ..., 3937657486715347520027492351')
 
-def test_throwaway_tempdir():
-    with M.throwaway_tempdir('test'):
-        d = tempfile.gettempdir()
-        st = os.stat(d)
-        assert_equal(stat.S_IMODE(st.st_mode), 0o700)
-        assert_true(stat.S_ISDIR(st.st_mode))
+def test_preloaded_file():
+    with tools.temporary_file(mode='wb') as file:
+        file.write(b'spam')
+        file.flush()
+        assert_equal(M.read_file(file.name), b'spam')
+        with M.preloaded_file(file.name, b'eggs'):
+            assert_equal(M.read_file(file.name), b'eggs')
+            assert_equal(M.get_preloaded_file(file.name), b'eggs')
+        assert_equal(M.read_file(file.name), b'spam')
 
 # vim:ts=4 sts=4 sw=4 et